@@ -1,10 +1,40 @@
 """fitting and averaging"""
 
+import math
+
+
 import numpy as np
 import scipy
 import hist
 
 
+def _mean_from_sums(sum_w, sum_vw, sum_vvw, shift = 0.):
+    """calculate the mean, standard deviation, and error of the mean from the
+    sum of the weights, weighted values, and weighted squared values
+
+    The values are expected to have already been shifted by subtracting the
+    input shift, which is added back to the mean.
+    """
+    mean = sum_vw/sum_w
+    # the variance is the mean of the squares minus the square of the mean
+    # rounding can make this slightly negative when all values are the same
+    stdd = np.sqrt(max(sum_vvw/sum_w - mean*mean, 0.))
+    merr = stdd/np.sqrt(sum_w)
+    return shift+mean, stdd, merr
+
+
+def _shift(values):
+    """value to subtract from the input values before summing their moments
+
+    Subtracting a value near the center keeps the sums of the squares from
+    being dominated by the square of the mean, which would lose the precision
+    of the variance when the mean is large compared to the spread of the values.
+    Any one of the values is close enough to the center for this, so we just use
+    the first one rather than spending another pass over the values finding the center.
+    """
+    return values[0] if len(values) > 0 else 0.
+
+
 # first I write my own mean calculation that includes the possibility of weights
 #   and returns the mean, standard deviation, and the error of the mean
 def weightedmean(values, weights = None) :
@@ -12,11 +42,21 @@ def weightedmean(values, weights = None) :
     
     This function isn't /super/ necessary, but it is helpful for the itermean
     function below where the same code needs to be called in multiple times.
+
+    The mean and variance are both calculated from sums over the (shifted) values
+    rather than first calculating the mean and then the spread of the values
+    around it. If no weights are provided, we assume they are all one.
     """ 
-    mean = np.average(values, weights=weights)
-    stdd = np.sqrt(np.average((values-mean)**2, weights=weights))
-    merr = stdd/np.sqrt(weights.sum())
-    return mean, stdd, merr
+    shift = _shift(values)
+    shifted = np.asarray(values)-shift
+    if weights is None:
+        return _mean_from_sums(len(values), np.sum(shifted), np.dot(shifted, shifted), shift)
+    return _mean_from_sums(
+        np.sum(weights),
+        np.dot(shifted, weights),
+        np.dot(shifted*shifted, weights),
+        shift
+    )
 
 # now I can write the iterative mean
 def itermean(values, weights = None, *, sigma_cut = 3.0) :
@@ -27,40 +67,87 @@ def itermean(values, weights = None, *, sigma_cut = 3.0) :
     If a sample is further from the mean than the sigma_cut times
     the standard deviation, it is removed.
     """
-    mean, stdd, merr = weightedmean(values, weights)
+    if weights is None:
+        weights = np.ones(len(values))
+    # the weights, weighted values, and weighted squared values whose sums over the
+    # selection give us the mean, we update these sums with only the samples that
+    # enter or leave the selection rather than re-summing the whole selection
+    #  the values are shifted once up front (see _shift) so that these sums keep
+    #  the precision of the variance and only accumulate small rounding as we update them
+    shift = _shift(values)
+    shifted = values-shift
+    moments = np.stack([weights, shifted*weights, shifted*shifted*weights])
     num_included = len(values)+1 # just to get loop started
     # first selection is all non-zero weighted samples
-    selection = (weights > 0) if weights is not None else np.full(len(values), True)
+    selection = (weights > 0)
+    sums = np.sum(moments[:,selection], axis=1)
     while np.count_nonzero(selection) < num_included :
         # update number included for this mean
         num_included = np.count_nonzero(selection)
         # calculate mean and std dev
-        mean, stdd, merr = weightedmean(values[selection], weights[selection] if weights is not None else None)
-        # determine new selection, since this variable was defined outside
-        #   the loop, we can use it in the `while` line and it will just be updated
-        selection = (values > (mean - sigma_cut*stdd)) & (values < (mean + sigma_cut*stdd))
+        mean, stdd, merr = _mean_from_sums(*sums, shift)
+        # determine new selection and update the sums to match it, since selection
+        #   was defined outside the loop, we can use it in the `while` line and it will just be updated
+        new_selection = (values > (mean - sigma_cut*stdd)) & (values < (mean + sigma_cut*stdd))
+        # if there is no spread (e.g. all of the values are the same) nothing is
+        # strictly within the cut, so we stop with the statistics of the current selection
+        if not np.any(new_selection):
+            break
+        sums += (
+            np.sum(moments[:,new_selection & ~selection], axis=1)
+            - np.sum(moments[:,selection & ~new_selection], axis=1)
+        )
+        selection = new_selection
 
     # left loop, meaning we settled into a state where nothing is outside sigma_cut standard deviations
     #   from our mean
     return mean, stdd, merr
 
 
+_INV_SQRT_2PI = 1.0/math.sqrt(2.0*math.pi)
+
+
 def scaled_normal(x, mean, stdd, scale):
-    return scale*scipy.stats.norm.pdf(x, mean, stdd)
+    """a normal distribution scaled by the input factor
+
+    This is called many times while fitting, so we write out the Gaussian
+    rather than going through the argument checking of scipy.stats.norm.pdf
+    """
+    z = (x-mean)/stdd
+    return (scale*_INV_SQRT_2PI/stdd)*np.exp(-0.5*z*z)
+
+
+def scaled_normal_jac(x, mean, stdd, scale):
+    """the jacobian of scaled_normal with respect to (mean, stdd, scale)
+
+    Giving this to curve_fit means it does not need to estimate the
+    jacobian by evaluating scaled_normal again for each parameter.
+    """
+    z = (x-mean)/stdd
+    # the unscaled normal distribution so that scale = 0 is not a problem
+    pdf = (_INV_SQRT_2PI/stdd)*np.exp(-0.5*z*z)
+    return np.column_stack([
+        scale*pdf*z/stdd,
+        scale*pdf*(z*z-1)/stdd,
+        pdf
+    ])
 
 
 def fit_histogram(histogram: hist.Hist, f, **kwargs):
     x    = histogram.axes[0].centers
     y    = histogram.values()
+    variances = histogram.variances()
     yerr = np.sqrt(
-        histogram.variances()
-        if histogram.variances() is not None else
-        histogram.values() # assume Poisson errors if no variances
+        variances
+        if variances is not None else
+        y # assume Poisson errors if no variances
     )
 
-    x = x[yerr > 0]
-    y = y[yerr > 0]
-    yerr = yerr[yerr > 0]
+    # only fit bins with a non-zero error
+    has_error = yerr > 0
+    x = x[has_error]
+    y = y[has_error]
+    yerr = yerr[has_error]
 
     return scipy.optimize.curve_fit(
         f,
@@ -73,4 +160,4 @@ def fit_histogram(histogram: hist.Hist, f, **kwargs):
 
 
 def fitnorm(histogram: hist.Hist):
-    return fit_histogram(histogram, scaled_normal)[0]
\ No newline at end of file
+    return fit_histogram(histogram, scaled_normal, jac = scaled_normal_jac)[0]
\ No newline at end of file
@@ -12,8 +12,6 @@ alpha: float
     fine structure constant in the low energy limit
 """
 
-import math
-
 c = 3.00e11 #mm/s
 hbar = 6.58e-22  # MeV*sec
 electron_mass = 0.511 # MeV
@@ -29,13 +27,13 @@ def Beta(x, y):
     """
     return (
         1
-        + math.pow(y, 2)
-        - math.pow(x, 2)
+        + y * y
+        - x * x
         - 2 * y
     ) * (
         1
-        + math.pow(y, 2)
-        - math.pow(x, 2)
+        + y * y
+        - x * x
         + 2 * y
     )
 
@@ -71,8 +71,10 @@ class Parameters:
     def rate_2pi(self, m_V):
         m_Ap, m_V, m_pi = self._masses(m_V, vd=True)
         coeff = (2.0 * self.alpha_dark / 3.0) * m_Ap
-        pow1 = math.pow((1 - (4 * m_pi * m_pi / (m_Ap * m_Ap))), 3 / 2.0)
-        pow2 = math.pow(((m_V * m_V) / ((m_Ap * m_Ap) - (m_V * m_V))), 2)
+        base1 = 1 - (4 * m_pi * m_pi / (m_Ap * m_Ap))
+        pow1 = base1 * math.sqrt(base1)
+        base2 = (m_V * m_V) / ((m_Ap * m_Ap) - (m_V * m_V))
+        pow2 = base2 * base2
         return coeff * pow1 * pow2
 
     
@@ -88,19 +90,20 @@ class Parameters:
         """decay rate of V where the dependence on the outgoing topology
         (the "Tv") is left out"""
         m_Ap, m_V, m_pi = self._masses(m_V, vd=True)
+        pi2 = math.pi * math.pi
+        ratio_Pid_to_Vd = self.mass_ratio_Ap_to_Pid/self.mass_ratio_Ap_to_Vd
+        ratio_mPi_to_fPi2 = self.ratio_mPi_to_fPi * self.ratio_mPi_to_fPi
+        beta = _general.Beta(
+            1/self.mass_ratio_Ap_to_Pid,
+            1/self.mass_ratio_Ap_to_Vd
+        )
         return (
-            self.alpha_dark / (192.0 * math.pow(math.pi, 4))
-            * math.pow(self.mass_ratio_Ap_to_Pid, 2)
-            * math.pow(self.mass_ratio_Ap_to_Pid/self.mass_ratio_Ap_to_Vd, 2)
-            * math.pow(self.ratio_mPi_to_fPi, 4)
+            self.alpha_dark / (192.0 * pi2 * pi2)
+            * self.mass_ratio_Ap_to_Pid * self.mass_ratio_Ap_to_Pid
+            * ratio_Pid_to_Vd * ratio_Pid_to_Vd
+            * ratio_mPi_to_fPi2 * ratio_mPi_to_fPi2
             * m_Ap
-            * math.pow(
-                _general.Beta(
-                    1/self.mass_ratio_Ap_to_Pid,
-                    1/self.mass_ratio_Ap_to_Vd
-                ),
-                3 / 2.0
-            )
+            * beta * math.sqrt(beta)
         )
     
 
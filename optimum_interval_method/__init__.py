@@ -29,8 +29,9 @@ to the signal model being tested.
 """
 
 
+import os
 import pathlib
-import pickle
+import tempfile
 
 
 import numpy as np
@@ -39,17 +40,55 @@ import numpy as np
 from . import _oim
 
 
+# the cache is a directory of .npy files so that the table can be memory-mapped
+# when loading rather than read (or unpickled) into memory all at once
 __cache_location = (
+  pathlib.Path(__file__).parent.resolve()
+  / 'max_interval_size_cdf_cache'
+)
+# older versions of this package pickled the OptimumIntervalMethod with a table that
+# was biased by an off-by-one in the generation, we do not load these tables
+__legacy_cache_location = (
   pathlib.Path(__file__).parent.resolve()
   / 'max_interval_size_cdf_cache.pkl'
 )
 
 
+def _save_array(name, array):
+    """write the array to a temporary file in the cache and then move it into place
+
+    Replacing the file rather than writing over it means that anything that has
+    memory-mapped the previous file (in this process or another) keeps reading
+    the previous table instead of crashing or reading a mix of the two.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=__cache_location, prefix=f'.{name}.', suffix='.npy')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            np.save(tmp_file, array)
+        os.replace(tmp_path, __cache_location / f'{name}.npy')
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _save(oim):
+    """write the table and its axes to the cache
+
+    The table is written last since its existence is what
+    marks the cache as available.
+    """
+    __cache_location.mkdir(exist_ok=True)
+    _save_array('mu_values', oim.mu_values)
+    _save_array('k_values', oim.k_values)
+    _save_array('table', oim.table)
+
+
 def new(*,
     mu_values = None,
     max_signal_strength = 20.0,
     n_test_mu = 100,
-    n_trials = 1_000
+    n_trials = 1_000,
+    seed = None
 ) -> _oim.OptimumIntervalMethod:
     """Actively generate the table in memory, writing the newly
     generated table to the cache location
@@ -64,6 +103,8 @@ def new(*,
         override the linearly-spaced mu values with an array of your own
     n_trials: int
         number of trials per signal strength to hold in the table
+    seed: None | int | np.random.SeedSequence
+        seed for the random number generator, set this to reproduce a table
 
     Returns
     -------
@@ -79,24 +120,47 @@ def new(*,
     from . import _sample_generation
     if mu_values is None:
         mu_values = np.linspace(0.0, max_signal_strength, n_test_mu)
-    table, mu, k, n = _sample_generation.generate_max_interval_samples(mu_values, n_trials)
+    table, mu, k, n = _sample_generation.generate_max_interval_samples(mu_values, n_trials, seed = seed)
     oim = _oim.OptimumIntervalMethod(
         table = table,
         mu_values = mu,
         k_values = k,
         n_trials_per_mu = n
     )
-    with open(__cache_location, 'wb') as cache_file:
-        pickle.dump(oim, cache_file)
+    _save(oim)
+    # forget the table max_signal_strength_allowed was holding so it uses the new one
+    max_signal_strength_allowed._oim_calculator = None
     return oim
 
 
 def load() -> _oim.OptimumIntervalMethod:
-    """Load the table from the cache, throw exception if no cache exists"""
+    """Load the table from the cache, throw exception if no cache exists
+
+    The table is memory-mapped read-only, so only the parts of it that
+    are used are actually read from disk and processes loading the same
+    cache can share it.
+    """
 
-    if __cache_location.is_file():
-        with open(__cache_location, 'rb') as cache_file:
-            return pickle.load(cache_file)
+    if (__cache_location / 'table.npy').is_file():
+        table = np.load(__cache_location / 'table.npy', mmap_mode='r')
+        mu_values = np.load(__cache_location / 'mu_values.npy')
+        k_values = np.load(__cache_location / 'k_values.npy')
+        # the files are replaced one at a time by new, so we could be reading
+        # the files of two different tables if it is running at the same time
+        if table.shape[:2] != (len(mu_values), len(k_values)):
+            raise ValueError('The OIM table in the cache does not match its signal strengths and k values, it may still be being written by `new`.')
+        return _oim.OptimumIntervalMethod(
+            table = table,
+            mu_values = mu_values,
+            k_values = k_values,
+            n_trials_per_mu = table.shape[-1]
+        )
+    if __legacy_cache_location.is_file():
+        raise ValueError(
+            f'Only a cache from an older version of this package was found ({__legacy_cache_location}).'
+            ' The tables generated by older versions are biased, so they are not loaded.'
+            ' Call `new` to generate a new table.'
+        )
     raise ValueError('No cache file to load OIM table from. Make sure to call `new` to define the test signal strengths and the size of the table.')
 
 
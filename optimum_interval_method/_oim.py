@@ -7,7 +7,7 @@ import warnings
 import numpy as np
 
 
-def largest_intervals_by_k(data):
+def largest_intervals_by_k(data, max_k = None):
     """generate list of largest intervals containing k data points according to the input data
 
     The returned array has one additional axis in the zero'th position
@@ -19,6 +19,9 @@ def largest_intervals_by_k(data):
         input array of data, it can be any dimension but the last index needs to
         be the index of data points. We expect the data points to already be transformed
         into a uniform distribution between 0 and 1 and be sorted.
+    max_k: int, optional
+        only calculate the largest intervals for k below this value,
+        default is to calculate them for all k up to the number of data points
 
     Returns
     -------
@@ -27,13 +30,68 @@ def largest_intervals_by_k(data):
         index over k in the zero'th position.
     """
     # assume the last axis is the one for the data of the events
-    data_with_edges = np.full((*data.shape[:-1], data.shape[-1]+2), 0.)
+    n_events = data.shape[-1]
+    n_k = n_events+1 if max_k is None else min(max_k, n_events+1)
+    data_with_edges = np.empty((*data.shape[:-1], n_events+2))
+    data_with_edges[...,0] = 0.
     data_with_edges[...,1:-1] = np.sort(data, axis=-1) # need to sort data
     data_with_edges[...,-1] = 1.
-    return np.array([
-        np.max(data_with_edges[...,(k+1):]-data_with_edges[...,:-1*(k+1)], axis=-1)
-        for k in range(data.shape[-1]+1)
-    ])
+    max_interval_by_k = np.empty((n_k, *data.shape[:-1]))
+    # the interval differences are written into the same buffer for each k
+    # so that we only ever hold the intervals for one k at a time
+    interval_differences = np.empty((*data.shape[:-1], n_events+1))
+    for k in range(n_k):
+        n_intervals = n_events+1-k
+        np.subtract(
+            data_with_edges[...,(k+1):],
+            data_with_edges[...,:-(k+1)],
+            out=interval_differences[...,:n_intervals]
+        )
+        np.max(
+            interval_differences[...,:n_intervals],
+            axis=-1,
+            out=max_interval_by_k[k,...]
+        )
+    return max_interval_by_k
+
+
+def _count_below(sorted_rows, values):
+    """count the number of entries in each row that are strictly below each value
+
+    This is equivalent to calling np.searchsorted(row, value, side='left') for every
+    row, but the binary search is done for all rows at once so we only loop over
+    the log2 of the row length in python.
+
+    Parameters
+    ----------
+    sorted_rows: np.array N-D
+        rows to search, sorted along the last axis
+    values: np.array N-D
+        values to count below, the last axis indexes the values to look up and
+        the other axes must broadcast with the other axes of sorted_rows
+
+    Returns
+    -------
+    np.array N-D
+        number of entries below each value with the broadcasted shape of the inputs,
+        stored in the smallest unsigned integer type that can hold the row length
+    """
+    n = sorted_rows.shape[-1]
+    shape = np.broadcast_shapes(sorted_rows.shape[:-1], values.shape[:-1])+values.shape[-1:]
+    # the counts are at most n so we can use a small integer type (e.g. uint16 for
+    # tables with up to 65535 trials) to keep the search arrays small
+    count_type = np.min_scalar_type(n)
+    lo = np.zeros(shape, dtype=count_type)
+    hi = np.full(shape, n, dtype=count_type)
+    # each step at least halves the range [lo, hi) we are searching within
+    for _ in range(n.bit_length()):
+        searching = lo < hi
+        # avoid lo+hi which could overflow the small count type
+        mid = lo + (hi-lo)//2
+        below = np.take_along_axis(sorted_rows, np.minimum(mid, n-1), axis=-1) < values
+        lo = np.where(searching & below, mid+1, lo)
+        hi = np.where(searching & ~below, mid, hi)
+    return lo
 
 
 @dataclass
@@ -45,6 +103,8 @@ class OptimumIntervalMethod:
     ----------
     table: np.array, 3D
         lookup table of maximum intervals indexed by mu index, k, and trial index
+        the trials must be sorted from smallest to largest maximum interval for
+        each mu and k, as done by _sample_generation.generate_max_interval_samples
     mu_values: np.array, 1D
         signal strength values used when generating the table above
     k_values: np.array, 1D
@@ -60,6 +120,16 @@ class OptimumIntervalMethod:
     k_values: np.array
     n_trials_per_mu: int
 
+
+    def __post_init__(self):
+        """store the table in single precision with the trials of each (mu, k) row
+        next to each other in memory since that is the axis the binary search reads along
+
+        This does not copy tables that are already C-contiguous and single precision
+        (like the ones we generate or memory-map from the cache).
+        """
+        self.table = np.ascontiguousarray(self.table, dtype=np.float32)
+
     
     def max_signal_strength_allowed(
         self,
@@ -90,52 +160,59 @@ class OptimumIntervalMethod:
             (200, 3)
             >>> max_signal_strength_allowed(data).shape
             (200,)
+
+        All of the data sets are evaluated together (the table is searched for every
+        one of them at once), so it is much faster to stack data sets with the same
+        number of events along the leading axes and make one call than it is to call
+        this function separately for each data set.
         """
         
         # apply the largest interval algorithm and store the largest intervals in
         # an array indexed by k
-        max_interval_by_k = largest_intervals_by_k(data)
-        confidence = np.full(
-            (
-                self.table.shape[0], # mu axis
-                *max_interval_by_k.shape, # k and data axes
-            ),
-            0.0
-        )
+        # k values outside of either the table or the data would have zero confidence
+        # so they are not calculated, this does not change the best confidence over k
+        max_interval_by_k = largest_intervals_by_k(data, max_k = self.table.shape[1])
+        n_k = max_interval_by_k.shape[0]
+        # flatten the data axes so that all of the k rows of the table for one mu
+        # can be searched at once
+        # intervals[k, data_index]
+        intervals = max_interval_by_k.reshape(n_k, -1)
+        # if a row doesn't have any mu above the confidence level, then we simply return
+        # the maximum (the last one in the list at index -1)
+        min_i_mu_above = np.full(intervals.shape[1], -1)
+        # the confidence count/n_trials is above the confidence level exactly when the count is
+        # above the largest count whose fraction is not, we find that count once so that the
+        # loop below can compare the integer counts directly without dividing them
+        threshold_count = np.searchsorted(
+            np.arange(self.n_trials_per_mu+1)/self.n_trials_per_mu,
+            confidence_level,
+            side='right'
+        )-1
+        # indices of the rows that have not found their minimum mu yet,
+        # intervals is shrunk to only these rows as they find it
+        remaining = np.arange(intervals.shape[1])
+        # ASSUMPTION: the signal strength axis is ordered by mu
+        #   this allows us to scan up the mu and stop at the first one above the
+        #   confidence level for each row, once a row has found its minimum mu
+        #   the larger mu do not need to be evaluated for it at all
         for i_mu in range(self.table.shape[0]):
-            for k in range(min(self.table.shape[1], max_interval_by_k.shape[0])):
-                confidence[i_mu,k,...] = np.sum(
-                    np.less.outer(
-                        self.table[i_mu,k,:],
-                        max_interval_by_k[k]
-                    ),
-                    axis=0
-                ) / self.n_trials_per_mu
-        best_conf_over_k = np.max(confidence, axis=1)
-        # select mu indices where this confidence is above the input threshold
-        # set the value for the mu that obtain this threshold to 1 and the others to 0
-        i_mu_above_selection = np.where(best_conf_over_k > confidence_level, 1, 0)
+            if remaining.size == 0:
+                break
+            # the confidence is the fraction of trials with a maximum interval strictly
+            # smaller than the data's, so we maximize the integer number of these trials over k
+            best_count_over_k = np.max(_count_below(self.table[i_mu,:n_k,:], intervals), axis=0)
+            crossed = best_count_over_k > threshold_count
+            min_i_mu_above[remaining[crossed]] = i_mu
+            remaining = remaining[~crossed]
+            intervals = intervals[:,~crossed]
         # if we never go above the given confidence level, just return the maximum mu we tested
         # after issuing a warning
-        if np.any(np.sum(i_mu_above_selection, axis=0) == 0):
+        if remaining.size > 0:
             warnings.warn((
                 'No tested signal strength in table reached the desired confidence level for some rows.'
                 ' Either expand the table or lower the confidence level.'
                 ' Returning the maximum signal strength tested as a proxy.'
             ))
-        # ASSUMPTION: the signal strength axis is ordered by mu
-        #   this allows us to find the minimum index and
-        #   then use that index to find the minimum mu
-        # we use argmax to find the minimum index since argmax exits at the first value that
-        # obtains the maximum which we know is the first value above the confidence_level due
-        # to how we constructed the array
-        # if the row doesn't have any mu above the confidence level, then we simply return
-        # the maximum (the last one in the list at index -1) as the warning above states
-        min_i_mu_above = np.where(
-            np.sum(i_mu_above_selection, axis=0)==0,
-            -1,
-            np.argmax(i_mu_above_selection, axis=0)
-        )
-        # now lookup the min mu using our min_i_mu
-        min_mu_above = self.mu_values[min_i_mu_above]
+        # now lookup the min mu using our min_i_mu, restoring the data axes
+        min_mu_above = self.mu_values[min_i_mu_above.reshape(max_interval_by_k.shape[1:])]
         return min_mu_above
@@ -3,7 +3,7 @@
 import numpy as np
 
 
-def generate_max_interval_samples(test_mu, n_trials_per_mu):
+def generate_max_interval_samples(test_mu, n_trials_per_mu, *, seed = None):
     """Generate the table of trials given the np.array of signal strengths to test
     and the number of trials to MC sample per signal strength
 
@@ -13,76 +13,90 @@ def generate_max_interval_samples(test_mu, n_trials_per_mu):
         the signal strength values we should test
     n_trials_per_mu: int
         number of trials to test with
+    seed: None | int | np.random.SeedSequence, optional
+        seed passed to np.random.default_rng to construct the random number generator,
+        default is None which draws fresh entropy from the OS
 
     Returns
     -------
     tuple(3D np.array, 1D np.array, 1D np.array, int)
         the table of trials whose indices are (i_mu, k, i_trial)
+        with the trials sorted from smallest to largest maximum interval
         signal strengths represented indexed by (i_mu)
         k values represented indexed by (k)
         number of trials for each mu
     """
 
+    rng = np.random.default_rng(seed)
+
     # first sample the mu into number of events in each trial
     # trial_counts[mu_index, trial_index]
-    trial_counts = np.swapaxes(
-        np.random.poisson(
-            test_mu,
-            size=(n_trials_per_mu,*test_mu.shape)
-        ),
-        0,
-        1
+    trial_counts = rng.poisson(
+        test_mu[:,np.newaxis],
+        size=(*test_mu.shape, n_trials_per_mu)
     )
 
-    # generate uniformly random numbers for each trial in each mu
-    # us[event_index, mu_index, trial_index]
-    us = np.random.random(
-        size=(np.max(trial_counts), *test_mu.shape, n_trials_per_mu)
-    )
-    # this over-generates numbers so we set any entries whose index
-    # is greater than the number of counts equal to the signal value np.nan
-    #  (we use np.nan since any arithmetic with np.nan produces np.nan)
-    us[np.greater.outer(np.arange(us.shape[0]), trial_counts)] = np.nan
-    # sort the entries in each event along the event index axis
-    us = np.sort(us, axis=0)
-    # add the edges of the distribution for calculating the interval sizes
+    # the trials have different numbers of events, so we hold them in an array
+    # large enough for the trial with the most events and set any entries whose index
+    # is greater than or equal to the number of counts equal to the upper edge 1.0
+    #  these entries sort to the end of each trial, so any interval reaching into
+    #  them is the same size as the interval ending at the upper edge of the trial
+    #  and we can find the maximum intervals without tracking which entries are real
+    # is_event[event_index, mu_index, trial_index]
+    is_event = np.less.outer(np.arange(np.max(trial_counts)), trial_counts)
+    # the samples are written directly between the edges of the distribution,
+    # which we need for calculating the interval sizes, and then sorted in place
+    # so that we don't hold separate copies of the unsorted and sorted samples
     # uswe[event_index, mu_index, trial_index]
-    uswe = np.full(
-        (us.shape[0]+2, *us.shape[1:]),
-        np.nan
-    )
-    # set the contents within the edges to the random samples from before
-    uswe[1:-1,...] = us
+    #  every entry is set below so there is no need to fill it first
+    #  single precision has plenty of resolution for uniform samples on [0,1]
+    #  and halves the memory that the sort and interval calculations move through
+    uswe = np.empty((is_event.shape[0]+2, *is_event.shape[1:]), dtype=np.float32)
     # set the lower edge to be zero
     uswe[0,...] = 0.0
     # set the upper edge to 1.0
-    #   the index of the upper edge is found by checking where the event index
-    #   is equal to the number of entries in the trial (+1 since we added the lower edge)
-    uswe[np.equal.outer(np.arange(uswe.shape[0]), trial_counts+1)] = 1.0
+    uswe[-1,...] = 1.0
+    # us[event_index, mu_index, trial_index] is a view of the contents within the edges
+    us = uswe[1:-1,...]
+    us[...] = 1.0
+    # generate uniformly random numbers only for the events that are in each trial
+    us[is_event] = rng.random(size=np.sum(trial_counts), dtype=np.float32)
+    # sort the entries in each event along the event index axis
+    us.sort(axis=0)
 
     max_possible_k = np.max(trial_counts)+1
     k_values = np.arange(max_possible_k)
     # calculate the maximum interval containing k events for each mu and each trial
-    # max_interval_by_k[k_index, mu_index, trial_index]
-    max_interval_by_k = np.full(
-        (max_possible_k, *uswe.shape[1:]),
-        np.nan
-    )
+    #  we store these directly with the mu index first so that the table is contiguous
+    #  for each mu and each (mu, k) row of trials, matching how the OIM reads it
+    # max_interval_by_k[mu_index, k_index, trial_index]
+    #  every entry is written by the k loop below so there is no need to fill it first
+    max_interval_by_k = np.empty((uswe.shape[1], max_possible_k, *uswe.shape[2:]), dtype=uswe.dtype)
     # this for loop is not expected to be a performance bottleneck since we expect the
     # k to be limited to ~50
-    # we use np.nan to ignore all of the signal values we inserted above
+    # if there are fewer than k events in a trial, the first interval spans from the
+    # lower edge into the padding and so the maximum interval is 1.0, which effectively
+    # means there is no way to get an interval of any size for that k
+    # the interval differences are written into the same buffer for each k
+    # so that we don't allocate a new array of (nearly) the size of uswe for every k
+    interval_differences = np.empty((uswe.shape[0]-1, *uswe.shape[1:]), dtype=uswe.dtype)
     for k in k_values:
-        # calculate interval differences with k entries in them
-        interval_differences = uswe[(k+1):,...]-uswe[:-(k+1),...]
-        # replace any NaNs leftover with -1.0 so they are eliminated by the np.max
-        interval_differences[np.isnan(interval_differences)] = -1.0
+        # calculate interval differences with k entries in them and
         # find maximum interval over the event index
-        max_interval_by_k[k,...] = np.max(interval_differences, axis=0)
+        n_intervals = uswe.shape[0]-(k+1)
+        np.subtract(
+            uswe[(k+1):,...],
+            uswe[:-(k+1),...],
+            out=interval_differences[:n_intervals,...]
+        )
+        np.max(
+            interval_differences[:n_intervals,...],
+            axis=0,
+            out=max_interval_by_k[:,k,...]
+        )
 
-    # if a maximum interval is -1.0 then that means there was no interval for that k
-    # for our purposes, we re-cast those values to a maximum interval of 1.0 since that
-    # effectively means there is no way to get an interval of any size for that k
-    max_interval_by_k[max_interval_by_k < 0.0] = 1.0
+    # the order of the trials is meaningless, so we sort them here once so that the
+    # OIM can count the trials below a maximum interval with a binary search
+    max_interval_by_k.sort(axis=-1)
 
-    # swap k and mu indices in table for easier access later on
-    return np.swapaxes(max_interval_by_k, 0, 1), test_mu, k_values, n_trials_per_mu
+    return max_interval_by_k, test_mu, k_values, n_trials_per_mu
@@ -0,0 +1,16 @@
+from ._oim import _count_below
+
+import numpy as np
+
+def test_matches_searchsorted():
+    rng = np.random.default_rng(0)
+    rows = np.sort(rng.random((4, 3, 101)), axis=-1)
+    values = np.concatenate([rng.random((3, 20)), rows[0,:,:5]], axis=-1)
+    counts = _count_below(rows, values)
+    assert counts.shape == (4, 3, 25)
+    for i in range(rows.shape[0]):
+        for j in range(rows.shape[1]):
+            np.testing.assert_array_equal(
+                counts[i,j],
+                np.searchsorted(rows[i,j], values[j], side='left')
+            )
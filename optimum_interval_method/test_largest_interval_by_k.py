@@ -7,3 +7,10 @@ def test_one_d():
         largest_intervals_by_k(np.array([0.1,0.2,0.84])),
         np.array([0.84-0.2, 1.0-0.2, 1.0-0.1, 1.0])
     )
+
+def test_max_k():
+    data = np.random.default_rng(0).random((4, 5, 6))
+    all_k = largest_intervals_by_k(data)
+    assert all_k.shape == (7, 4, 5)
+    np.testing.assert_array_equal(largest_intervals_by_k(data, max_k = 3), all_k[:3])
+    np.testing.assert_array_equal(largest_intervals_by_k(data, max_k = 10), all_k)
@@ -0,0 +1,34 @@
+from ._sample_generation import generate_max_interval_samples
+from ._oim import largest_intervals_by_k
+
+import numpy as np
+
+
+def _brute_force(mu, n_trials, rng, n_k):
+    """max intervals of trials drawn one event count at a time with largest_intervals_by_k"""
+    counts = rng.poisson(mu, size=n_trials)
+    # intervals for k above the number of events span the whole range
+    max_interval_by_k = np.ones((n_k, n_trials))
+    for n in np.unique(counts):
+        in_trial = (counts == n)
+        intervals = largest_intervals_by_k(rng.random((np.count_nonzero(in_trial), n)))
+        max_interval_by_k[:min(n+1, n_k), in_trial] = intervals[:n_k]
+    return max_interval_by_k
+
+
+def test_matches_brute_force():
+    mu = np.array([0.5, 3.0, 10.0])
+    n_trials = 4_000
+    table, _mu, k_values, _n = generate_max_interval_samples(mu, n_trials, seed = 1)
+    assert table.shape == (len(mu), len(k_values), n_trials)
+    rng = np.random.default_rng(2)
+    n_k = 8
+    for i_mu, m in enumerate(mu):
+        brute = _brute_force(m, n_trials, rng, n_k)
+        generated = table[i_mu,:n_k,:]
+        # the means and the fraction of trials with fewer than k events should
+        # agree within the statistical uncertainty of both samples
+        error = np.sqrt((np.var(brute, axis=-1)+np.var(generated, axis=-1))/n_trials)
+        assert np.all(np.abs(np.mean(generated, axis=-1)-np.mean(brute, axis=-1)) <= 4*error+1e-12)
+        error = np.sqrt(2*0.25/n_trials)
+        assert np.all(np.abs(np.mean(generated == 1., axis=-1)-np.mean(brute == 1., axis=-1)) <= 4*error)
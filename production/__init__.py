@@ -4,15 +4,18 @@
     import production
     signal_yield_per_eps2 = production.from_calculators(
         production.radiative_fraction.alic_2016_simps,
-        production.trident_differential_production.lut_estimate(
+        production.TridentDifferentialProduction.load(
             '/path/to/reference.root:root/tree',
-            production.mass_resolution.alic_2016_simps,
+            250.0
         ),
         production.radiative_acceptance.alic_2016_simps
     )
 
 """
 
+import functools
+
+
 import numpy as np
 
 from ._trident_differential_production import TridentDifferentialProduction
@@ -22,6 +25,38 @@ from . import radiative_acceptance
 from . import radiative_fraction
 
 
+_signal_yield_prefactor = 3. * (137./2.) * np.pi
+"""constant factor relating the trident differential production to the signal yield
+(without the epsilon^2)"""
+
+
+def _reuse_last_result(impl):
+    """wrap the input function of mass so that it is only evaluated again when
+    the input mass changes
+
+    Exclusion scans often evaluate the signal yield on the same mass (or grid of
+    masses) for many values of epsilon^2 in a row, so remembering the last input
+    and result avoids re-evaluating all of the calculators. We keep a copy of the
+    mass so that changing the input array in place is noticed and return a copy of
+    the result so that changing the output in place does not change the remembered one.
+    Like functools.lru_cache, the wrapped function has a cache_clear method to forget
+    the remembered result.
+    """
+    last = {}
+    @functools.wraps(impl)
+    def _impl(mass):
+        if 'mass' not in last or not np.array_equal(mass, last['mass']):
+            # evaluate before remembering anything so that if the calculators raise,
+            # we don't remember the new mass alongside the result for the old one
+            signal_yield = impl(mass)
+            last['mass'] = np.array(mass)
+            last['signal_yield'] = signal_yield
+        signal_yield = last['signal_yield']
+        return signal_yield.copy() if isinstance(signal_yield, np.ndarray) else signal_yield
+    _impl.cache_clear = last.clear
+    return _impl
+
+
 def from_calculators(
     rad_frac,
     tdp,
@@ -76,23 +111,24 @@ def from_calculators(
         rad_frac = getattr(radiative_fraction, rad_frac)
 
 
+    # the product of the calculators is a new array (if mass is an array), so we
+    # apply the remaining factors to it in place rather than making a new
+    # temporary array for each factor
+    #  the product is made in double precision so that the in-place factors work
+    #  for calculators returning integers or single-precision values
     if rad_acc is None:
         def _impl(mass):
-            return (
-                (3. * (137./2.) * np.pi)
-                * mass * rad_frac(mass)
-                * tdp(mass)
-            )
-        _impl.__doc__ = doc
-        return _impl
+            signal_yield = np.multiply(rad_frac(mass), tdp(mass), dtype=np.float64)
+            signal_yield *= mass
+            signal_yield *= _signal_yield_prefactor
+            return signal_yield
     else:
         def _impl(mass):
-            return (
-                (3. * (137./2.) * np.pi)
-                * mass * rad_frac(mass)
-                * tdp(mass)
-                / rad_acc(mass)
-            )
-        _impl.__doc__ = doc
-        return _impl
+            signal_yield = np.multiply(rad_frac(mass), tdp(mass), dtype=np.float64)
+            signal_yield *= mass
+            signal_yield *= _signal_yield_prefactor
+            signal_yield /= rad_acc(mass)
+            return signal_yield
+    _impl.__doc__ = doc
+    return _reuse_last_result(_impl)
 
@@ -1,5 +1,8 @@
 """construct a polynomial from the input coefficients"""
 
+import numpy as np
+
+
 def polynomial(
     *coefficients,
     x_units = None
@@ -36,17 +39,13 @@ def polynomial(
         f = polynomail(2, 3, 4, x_units = 1000.)
     """
 
-    if x_units is None:
-        def _series_impl(x):
-            return sum([
-                coefficient * x**power
-                for power, coefficient in enumerate(coefficients)
-            ])
-        return _series_impl
-    else:
-        def _series_impl(x):
-            return sum([
-                coefficient * (x/x_units)**power
-                for power, coefficient in enumerate(coefficients)
-            ])
-        return _series_impl
\ No newline at end of file
+    # numpy evaluates the series with Horner's method using these coefficients
+    # so we don't need to calculate any of the powers of x
+    coefficients = np.array(coefficients, dtype=float)
+    # dividing x by x_units is the same as dividing the coefficient of x^k by x_units^k,
+    # so we fold the units into the coefficients once here rather than on every call
+    if x_units is not None:
+        coefficients = coefficients * float(x_units)**-np.arange(len(coefficients))
+    def _series_impl(x):
+        return np.polynomial.polynomial.polyval(x, coefficients)
+    return _series_impl
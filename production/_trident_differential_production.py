@@ -9,19 +9,27 @@ and requires an estimate of the mass resolution.
 """
 
 from dataclasses import dataclass
+import functools
+import hashlib
 import pathlib
 import sys
-import pickle
 
 
 import numpy as np
 import uproot
 
 
-_cache_location = (
-    pathlib.Path(__file__).parent.resolve()
-    / 'trident_differential_production_cache.pkl'
-)
+_cache_directory = pathlib.Path(__file__).parent.resolve()
+
+
+def _cache_location(*load_args):
+    """location of the cache file for the input arguments to TridentDifferentialProduction.load
+
+    The arguments are hashed into the name of the file so that changing them
+    does not load a distribution constructed with different arguments.
+    """
+    key = hashlib.blake2b(repr(load_args).encode(), digest_size=8).hexdigest()
+    return _cache_directory / f'trident_differential_production_cache_{key}.npz'
 
 
 @dataclass
@@ -54,12 +62,13 @@ class TridentDifferentialProduction:
 
     @classmethod
     def delete_cache(_cls):
-        """Delete the cache file, necessary when changing arguments to load
+        """Delete all of the cache files
 
-        Hopefully, when I have time, I can implement a functional hashing algorithm
-        so that this re-creation of the cache file is done automatically.
+        This is only necessary if the reference files themselves change,
+        each set of arguments to load has its own cache file.
         """
-        _cache_location.unlink(missing_ok=True)
+        for cache_file in _cache_directory.glob('trident_differential_production_cache*'):
+            cache_file.unlink(missing_ok=True)
 
 
     @classmethod
@@ -78,7 +87,7 @@ class TridentDifferentialProduction:
     
         Parameters
         ----------
-        reference: files input to [uproot.concatenate](https://uproot.readthedocs.io/en/latest/uproot.behaviors.TBranch.concatenate.html)
+        reference: files input to [uproot.iterate](https://uproot.readthedocs.io/en/latest/uproot.behaviors.TBranch.iterate.html)
             Specification of ROOT TTree that you want to use as the reference for
             filling the histogram modeling the distribution
         mass_maximum_MeV: float
@@ -93,34 +102,58 @@ class TridentDifferentialProduction:
             conversion factor to multiply values of mass_branch to get them into units of MeV
             default is 1000.0
         """
-        if _cache_location.is_file():
-            with open(_cache_location, 'rb') as f:
-                return pickle.load(f)
-        bkgd_CR = uproot.concatenate(
+        cache_location = _cache_location(
             reference,
-            expressions = [ mass_branch ],
-            cut = cr_cut,
-            library = 'np'
+            mass_maximum_MeV,
+            mass_window_width,
+            mass_branch,
+            mass_branch_to_MeV,
+            cr_cut
         )
+        if cache_location.is_file():
+            with np.load(cache_location) as cache:
+                return cls(
+                    bin_edges = cache['bin_edges'],
+                    bin_values = cache['bin_values']
+                )
         # shifting by half window width so the bin centers are
         # np.arange(0.0, mass_maximum_MeV+mass_window_width, mass_window_width)
-        counts, bin_edges = np.histogram(
-            bkgd_CR[mass_branch]*mass_branch_to_MeV,
-            bins = np.arange(
-                -mass_window_width/2,
-                mass_maximum_MeV+3*mass_window_width/2,
-                mass_window_width
-            )
+        bin_edges = np.arange(
+            -mass_window_width/2,
+            mass_maximum_MeV+3*mass_window_width/2,
+            mass_window_width
         )
+        counts = np.zeros(len(bin_edges)-1, dtype=np.int64)
+        # fill the histogram one chunk of the reference at a time
+        # so that we never need to hold the entire mass branch in memory
+        for bkgd_CR in uproot.iterate(
+            reference,
+            expressions = [ mass_branch ],
+            cut = cr_cut,
+            step_size = '100 MB',
+            library = 'np'
+        ):
+            chunk_counts, _ = np.histogram(
+                bkgd_CR[mass_branch]*mass_branch_to_MeV,
+                bins = bin_edges
+            )
+            counts += chunk_counts
+
         widths = bin_edges[1:]-bin_edges[:-1]
 
+        # the distribution is only used as a lookup table and the counts are
+        # far below where single precision would lose integer resolution,
+        # so we store it as float32 to halve the size of the table being gathered from
         tdp = cls(
             bin_edges = bin_edges,
-            bin_values = counts/widths,
+            bin_values = (counts/widths).astype(np.float32),
         )
         
-        with open(_cache_location, 'wb') as f:
-            pickle.dump(tdp, f)
+        np.savez(
+            cache_location,
+            bin_edges = tdp.bin_edges,
+            bin_values = tdp.bin_values
+        )
         
         return tdp
 
@@ -134,9 +167,50 @@ class TridentDifferentialProduction:
         )
 
     
+    @functools.cached_property
+    def _uniform_bin_width(self):
+        """the width of the bins if they all have the same width, None otherwise"""
+        widths = self.bin_edges[1:]-self.bin_edges[:-1]
+        if np.allclose(widths, widths[0], rtol=1e-9, atol=0.):
+            return widths[0]
+        return None
+
+
     def __call__(self, mass):
-        """look up the differential production corresponding to the input dark photon mass"""
-        bin_indices = np.digitize(mass, bins = self.bin_edges)-1
+        """look up the differential production corresponding to the input dark photon mass
+
+        The bin containing each mass is the same as found by np.digitize.
+        If the bins all have the same width (as they do when constructed with load),
+        the bin index is calculated directly from the mass instead of searching
+        through the bin edges.
+        """
+        if self._uniform_bin_width is None:
+            bin_indices = np.digitize(mass, bins = self.bin_edges)-1
+        else:
+            mass = np.asarray(mass)
+            n_edges = len(self.bin_edges)
+            # np.digitize puts masses below (above) the edges in the bin before (after) them,
+            # we limit the bin index to these bins before casting it to an integer so that
+            # masses that are too large for an integer are still above the edges
+            #  np.fmin replaces NaN with the bin after the edges, as np.digitize does
+            bin_indices = np.fmax(
+                np.fmin(
+                    np.floor((mass-self.bin_edges[0])/self._uniform_bin_width),
+                    n_edges-1
+                ),
+                -1
+            ).astype(np.intp)
+            # the division can be rounded into a neighboring bin for masses on (or within
+            # rounding of) a bin edge, when the width is not exact in binary, so we check
+            # the index against the edges of its bin and move it over if needed
+            bin_indices = bin_indices - (
+                (bin_indices >= 0)
+                & (self.bin_edges[np.maximum(bin_indices, 0)] > mass)
+            )
+            bin_indices = bin_indices + (
+                (bin_indices < n_edges-1)
+                & (self.bin_edges[np.minimum(bin_indices+1, n_edges-1)] <= mass)
+            )
         return self.bin_values[bin_indices]
 
 
@@ -0,0 +1,54 @@
+from . import from_calculators, TridentDifferentialProduction
+
+import numpy as np
+import pytest
+
+
+def _tdp():
+    bin_edges = np.arange(-0.5, 100.5+1.0, 1.0)
+    return TridentDifferentialProduction(
+        bin_edges = bin_edges,
+        bin_values = np.arange(len(bin_edges)-1, dtype=float)
+    )
+
+
+def test_reuse_and_in_place_changes():
+    f = from_calculators(lambda m: np.ones_like(m), _tdp())
+    mass = np.array([10., 20., 30.])
+    first = f(mass)
+    np.testing.assert_allclose(f(mass), first)
+    # changing the result in place does not change the remembered one
+    first *= 2
+    np.testing.assert_allclose(f(mass), first/2)
+    # changing the input in place is noticed
+    mass[0] = 40.
+    fresh = from_calculators(lambda m: np.ones_like(m), _tdp())
+    np.testing.assert_allclose(f(mass), fresh(np.array([40., 20., 30.])))
+
+
+def test_exception_is_not_remembered():
+    f = from_calculators(lambda m: np.ones_like(m), _tdp())
+    # fails on the first call as well as after a successful one
+    with pytest.raises(IndexError):
+        f(1000.)
+    with pytest.raises(IndexError):
+        f(1000.)
+    good = f(50.)
+    with pytest.raises(IndexError):
+        f(1000.)
+    with pytest.raises(IndexError):
+        f(1000.)
+    assert f(50.) == good
+
+
+def test_double_precision():
+    single = TridentDifferentialProduction(
+        bin_edges = _tdp().bin_edges,
+        bin_values = _tdp().bin_values.astype(np.float32)
+    )
+    mass = np.array([10., 20., 30.])
+    assert from_calculators(lambda m: 0.5, single)(mass).dtype == np.float64
+    assert from_calculators(lambda m: 0.5, single, lambda m: 2)(mass).dtype == np.float64
+    integers = from_calculators(lambda m: 2, lambda m: 3, lambda m: 4)
+    assert integers(10) == pytest.approx(2*3*10*3*(137./2.)*np.pi/4)
+    assert integers(np.array([10])).dtype == np.float64
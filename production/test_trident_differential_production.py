@@ -0,0 +1,32 @@
+from ._trident_differential_production import TridentDifferentialProduction
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize('width', [1.0, 0.1, 0.3, 0.25, 2.7])
+def test_matches_digitize(width):
+    bin_edges = np.arange(-width/2, 250.+3*width/2, width)
+    tdp = TridentDifferentialProduction(
+        bin_edges = bin_edges,
+        bin_values = np.arange(len(bin_edges)-1, dtype=float)
+    )
+    assert tdp._uniform_bin_width is not None
+    rng = np.random.default_rng(0)
+    mass = np.concatenate([
+        bin_edges[:-1],
+        np.nextafter(bin_edges[1:-1], -np.inf),
+        np.round(np.arange(0., 250., 0.05), 2),
+        rng.uniform(bin_edges[0], bin_edges[-1], 10_000),
+        [bin_edges[0]-3*width, bin_edges[0]-width/2, -np.inf, -1e30]
+    ])
+    expected = tdp.bin_values[np.digitize(mass, bins = bin_edges)-1]
+    np.testing.assert_array_equal(tdp(mass), expected)
+    for m in mass[::97]:
+        assert tdp(m) == tdp.bin_values[np.digitize(m, bins = bin_edges)-1]
+    # masses past the last edge (or not a number) do not have a bin
+    for m in [bin_edges[-1], bin_edges[-1]+width, np.nan, np.inf, 1e30]:
+        with pytest.raises(IndexError):
+            tdp(m)
+        with pytest.raises(IndexError):
+            tdp(np.array([100., m]))
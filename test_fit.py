@@ -0,0 +1,45 @@
+from fit import weightedmean, itermean
+
+import numpy as np
+
+
+def _two_pass(values, weights):
+    mean = np.average(values, weights=weights)
+    stdd = np.sqrt(np.average((values-mean)**2, weights=weights))
+    return mean, stdd, stdd/np.sqrt(np.sum(weights))
+
+
+def test_weightedmean_large_offset():
+    rng = np.random.default_rng(0)
+    values = rng.normal(1e6, 0.01, 10_000)
+    weights = rng.random(len(values))
+    np.testing.assert_allclose(weightedmean(values, weights), _two_pass(values, weights), rtol=1e-9)
+    np.testing.assert_allclose(weightedmean(values), _two_pass(values, np.ones(len(values))), rtol=1e-9)
+
+
+def _two_pass_itermean(values, weights, sigma_cut = 3.0):
+    selection = weights > 0
+    num_included = len(values)+1
+    while np.count_nonzero(selection) < num_included:
+        num_included = np.count_nonzero(selection)
+        mean, stdd, merr = _two_pass(values[selection], weights[selection])
+        selection = (values > (mean - sigma_cut*stdd)) & (values < (mean + sigma_cut*stdd))
+    return mean, stdd, merr
+
+
+def test_itermean_large_offset():
+    rng = np.random.default_rng(1)
+    values = np.concatenate([rng.normal(1e6, 0.01, 10_000), rng.normal(1e6, 1., 100)])
+    weights = rng.random(len(values))
+    np.testing.assert_allclose(itermean(values, weights), _two_pass_itermean(values, weights), rtol=1e-9)
+    np.testing.assert_allclose(
+        itermean(values),
+        _two_pass_itermean(values, np.ones(len(values))),
+        rtol=1e-9
+    )
+
+
+def test_itermean_constant_values():
+    values = np.full(100, 3.5)
+    assert itermean(values) == (3.5, 0., 0.)
+    assert itermean(values, np.linspace(0., 1., 100)) == (3.5, 0., 0.)